@@ -5,12 +5,12 @@ Tests WebSocket streaming performance and latency
 """
 
 import asyncio
-import json
+import socket
 import time
-import statistics
-from collections import defaultdict
+from collections import Counter, defaultdict
 import argparse
 import sys
+from typing import Optional
 
 try:
     import websockets
@@ -19,74 +19,280 @@ except ImportError:
     print("Install with: pip install websockets")
     sys.exit(1)
 
+from websockets.uri import parse_uri
+
+# Proxy support (and get_proxy) arrived in websockets 15; older releases
+# always connect directly
+try:
+    from websockets.proxy import get_proxy
+except ImportError:
+    def get_proxy(uri):
+        return None
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy library not installed")
+    print("Install with: pip install numpy")
+    sys.exit(1)
+
+# uvloop is an optional, faster drop-in for the default asyncio event loop
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Numba compiles the latency summary for large runs; plain numpy otherwise
+try:
+    from numba import njit
+except ImportError:
+    def njit(*_args, **_kwargs):
+        return lambda func: func
+
+# Per-message decoding. msgspec decodes straight into a typed struct holding
+# only the fields the benchmark reads and skips the rest without building a
+# dict; otherwise fall back to the fastest available JSON parser. Both paths
+# accept the raw bytes of each frame.
+try:
+    import msgspec
+
+    class TickLite(msgspec.Struct):
+        """The /stream fields the benchmark reads"""
+        type: str = 'unknown'
+        epoch_ms: Optional[int] = None
+        update_interval_ms: Optional[int] = None
+
+    decode_message = msgspec.json.Decoder(TickLite).decode
+    _DecodeError = msgspec.DecodeError
+except ImportError:
+    try:
+        import orjson as _json
+    except ImportError:
+        try:
+            import ujson as _json
+        except ImportError:
+            import json as _json
+
+    class TickLite:
+        """The /stream fields the benchmark reads"""
+        __slots__ = ('type', 'epoch_ms', 'update_interval_ms')
+
+        def __init__(self, data):
+            self.type = data.get('type', 'unknown')
+            self.epoch_ms = data.get('epoch_ms')
+            self.update_interval_ms = data.get('update_interval_ms')
+
+    def decode_message(raw):
+        return TickLite(_json.loads(raw))
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError (a ValueError)
+    _DecodeError = getattr(_json, 'JSONDecodeError', ValueError)
+
+# Upper bound on a single frame; ticks are a few hundred bytes
+MAX_FRAME_SIZE = 2 ** 16
+
+# Client options for the stream: no permessage-deflate (ticks are tiny, so
+# zlib is pure overhead) and no keepalive pings during short benchmark runs
+CONNECT_OPTIONS = {
+    'compression': None,
+    'max_size': MAX_FRAME_SIZE,
+    'open_timeout': 5,
+    'ping_interval': None,
+}
+
+# Per-connection latency buffers are sized before the run from the
+# update_interval_ms in the server's welcome message, plus headroom for
+# ticks the server sends in a burst to catch up. If the welcome can't be
+# read, assume the server's default WS_UPDATE_INTERVAL_MS (1000, i.e. 1
+# tick/s) and grow the buffers by doubling if needed.
+INITIAL_TICK_RATE = 1
+TICK_HEADROOM = 1.1
+
+# Handshakes allowed in flight at once; established connections stay open
+MAX_CONCURRENT_HANDSHAKES = 32
+
+
+@njit(cache=True)
+def summarize_latencies(latencies_ns):
+    """
+    Return (min, mean, p50, p95, p99, max) of an int64 latency buffer.
+
+    Order statistics come from a single np.partition, O(N) rather than
+    the O(N log N) of a full sort.
+    """
+    n = latencies_ns.size
+    kth = np.array([0, n // 2, int(n * 0.95), int(n * 0.99), n - 1])
+    part = np.partition(latencies_ns, kth)
+    return (part[kth[0]], latencies_ns.mean(), part[kth[1]],
+            part[kth[2]], part[kth[3]], part[kth[4]])
+
 
 class WebSocketBenchmark:
     def __init__(self, url, duration_secs=10, num_connections=1):
         self.url = url
         self.duration_secs = duration_secs
         self.num_connections = num_connections
+        self.connect_options = dict(CONNECT_OPTIONS)
         self.results = defaultdict(list)
-
-    async def benchmark_connection(self, connection_id):
+        self.msg_type_counts = Counter()
+        self.json_errors = 0
+        self.messages_received_total = 0
+        # Tick delivery latencies (ns) as one row per connection; counts[cid]
+        # is the number of filled samples in row cid. Resized in run() once
+        # the server's tick interval is known.
+        self.latencies = np.zeros(
+            (num_connections, duration_secs * INITIAL_TICK_RATE + 1), dtype=np.int64
+        )
+        self.counts = np.zeros(num_connections, dtype=np.int64)
+
+    def _allocate_latencies(self, update_interval_ms):
+        """Size every latency row for a full run at the given tick interval"""
+        ticks = self.duration_secs * 1000 // max(1, update_interval_ms)
+        self.latencies = np.zeros(
+            (self.num_connections, int(ticks * TICK_HEADROOM) + 16), dtype=np.int64
+        )
+
+    def _grow_latencies(self):
+        """Double the per-connection sample capacity of the latency buffer"""
+        self.latencies = np.concatenate(
+            (self.latencies, np.zeros_like(self.latencies)), axis=1
+        )
+
+    async def benchmark_connection(self, connection_id, handshake_limit):
         """Benchmark a single WebSocket connection"""
         messages_received = 0
-        latencies = []
-        start_time = time.time()
+        count = 0
 
         try:
-            async with websockets.connect(self.url) as websocket:
+            # Only the handshake is rate-limited; the semaphore is released
+            # as soon as the connection is up
+            async with handshake_limit:
+                start_time = time.time()
+                websocket = await websockets.connect(self.url, **self.connect_options)
                 connection_time = time.time() - start_time
-                self.results['connection_times'].append(connection_time)
-
-                # Receive messages for specified duration
-                deadline = time.time() + self.duration_secs
 
-                while time.time() < deadline:
-                    try:
-                        message_start = time.time()
-                        message = await asyncio.wait_for(
-                            websocket.recv(),
-                            timeout=max(0.1, deadline - time.time())
-                        )
-                        message_latency = time.time() - message_start
-
-                        data = json.loads(message)
-                        messages_received += 1
-                        latencies.append(message_latency)
-
-                        # Track message types
-                        msg_type = data.get('type', 'unknown')
-                        self.results[f'msg_type_{msg_type}'].append(1)
+            async with websocket:
+                self.results['connection_times'].append(connection_time)
 
-                    except asyncio.TimeoutError:
-                        break
-                    except json.JSONDecodeError:
-                        self.results['json_errors'].append(1)
+                # Receive messages for specified duration. One timer cancels
+                # the loop, so there is no clock check or wait_for per message.
+                try:
+                    async with asyncio.timeout(self.duration_secs):
+                        while True:
+                            # recv() returns already-buffered frames without
+                            # suspending, so bursts drain in a tight loop
+                            message = await websocket.recv(decode=False)
+                            # Wall clock on arrival; compared against the
+                            # server's NTP-derived epoch_ms below. epoch_ms is
+                            # truncated to whole ms, so each sample reads
+                            # 0-1 ms (about 0.5 ms on average) high.
+                            recv_ns = time.time_ns()
+
+                            try:
+                                tick = decode_message(message)
+                            except _DecodeError:
+                                self.json_errors += 1
+                                continue
+                            messages_received += 1
+
+                            epoch_ms = tick.epoch_ms
+                            if epoch_ms is not None:
+                                if count == self.latencies.shape[1]:
+                                    self._grow_latencies()
+                                self.latencies[connection_id, count] = recv_ns - epoch_ms * 1_000_000
+                                count += 1
+
+                            # Track message types
+                            self.msg_type_counts[tick.type] += 1
+                except asyncio.TimeoutError:
+                    pass
 
                 self.results['messages_per_connection'].append(messages_received)
-                self.results['latencies'].extend(latencies)
+                self.messages_received_total += messages_received
+                self.counts[connection_id] = count
 
         except Exception as e:
             self.results['connection_errors'].append(str(e))
             print(f"Connection {connection_id} error: {e}")
 
+    async def resolve_endpoint(self):
+        """
+        Resolve the URL's host once and return the first address that
+        accepts TCP connections, or None if none does (or a proxy applies).
+
+        Every connection then dials that address directly instead of
+        repeating the DNS lookup (and any failed IPv6/IPv4 attempts) itself.
+        The Host header and TLS server name still come from the URL. Each
+        address is probed with a plain TCP connect, bounded by open_timeout,
+        so the server sees one extra connection closed without a handshake.
+        """
+        uri = parse_uri(self.url)
+        if get_proxy(uri) is not None:
+            # The host/port override would bypass (and break) the proxy
+            return None
+
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(uri.host, uri.port, type=socket.SOCK_STREAM)
+        except OSError:
+            return None
+
+        for *_, sockaddr in infos:
+            try:
+                async with asyncio.timeout(CONNECT_OPTIONS['open_timeout']):
+                    _, writer = await asyncio.open_connection(sockaddr[0], sockaddr[1])
+            except (OSError, asyncio.TimeoutError):
+                continue
+            writer.close()
+            await writer.wait_closed()
+            return sockaddr[0], sockaddr[1]
+        return None
+
+    async def fetch_update_interval_ms(self):
+        """
+        Read update_interval_ms from the server's welcome message over a
+        short-lived connection, or return None if it can't be read.
+        """
+        try:
+            async with asyncio.timeout(CONNECT_OPTIONS['open_timeout']):
+                async with websockets.connect(self.url, **self.connect_options) as websocket:
+                    welcome = decode_message(await websocket.recv(decode=False))
+        except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException, _DecodeError):
+            return None
+        return welcome.update_interval_ms
+
     async def run(self):
         """Run benchmark with multiple concurrent connections"""
+        address = await self.resolve_endpoint()
+        if address:
+            self.connect_options.update(host=address[0], port=address[1])
+
+        # Size the latency buffers up front so no connection has to grow
+        # (and copy) the shared matrix in the middle of the measurement
+        update_interval_ms = await self.fetch_update_interval_ms()
+        if update_interval_ms:
+            self._allocate_latencies(update_interval_ms)
+
         print("=" * 50)
         print("WebSocket Benchmark - NTP Time JSON API")
         print("=" * 50)
         print(f"URL:              {self.url}")
+        if address:
+            print(f"Address:          {address[0]} port {address[1]}")
         print(f"Duration:         {self.duration_secs}s")
         print(f"Connections:      {self.num_connections}")
+        if update_interval_ms:
+            print(f"Tick interval:    {update_interval_ms}ms")
+        print(f"Event loop:       {type(asyncio.get_running_loop()).__module__.split('.')[0]}")
         print("=" * 50)
         print("Running benchmark...\n")
 
-        # Start all connections concurrently
-        tasks = [
-            self.benchmark_connection(i)
-            for i in range(self.num_connections)
-        ]
-        await asyncio.gather(*tasks)
+        # Start all connections concurrently, ramping up handshakes in
+        # bounded batches
+        handshake_limit = asyncio.Semaphore(MAX_CONCURRENT_HANDSHAKES)
+        async with asyncio.TaskGroup() as tg:
+            for i in range(self.num_connections):
+                tg.create_task(self.benchmark_connection(i, handshake_limit))
 
         self.print_results()
 
@@ -97,13 +303,13 @@ class WebSocketBenchmark:
         print("=" * 50)
 
         # Connection statistics
-        conn_times = self.results['connection_times']
-        if conn_times:
+        conn_times = np.asarray(self.results['connection_times'])
+        if conn_times.size:
             print(f"\nConnection Times:")
-            print(f"  Successful:      {len(conn_times)}")
-            print(f"  Min:             {min(conn_times):.6f}s")
-            print(f"  Avg:             {statistics.mean(conn_times):.6f}s")
-            print(f"  Max:             {max(conn_times):.6f}s")
+            print(f"  Successful:      {conn_times.size}")
+            print(f"  Min:             {conn_times.min():.6f}s")
+            print(f"  Avg:             {conn_times.mean():.6f}s")
+            print(f"  Max:             {conn_times.max():.6f}s")
 
         # Connection errors
         conn_errors = self.results['connection_errors']
@@ -113,40 +319,44 @@ class WebSocketBenchmark:
         # Message statistics
         messages = self.results['messages_per_connection']
         if messages:
-            total_messages = sum(messages)
+            total_messages = self.messages_received_total
             print(f"\nMessages Received:")
             print(f"  Total:           {total_messages}")
-            print(f"  Per connection:  {statistics.mean(messages):.1f}")
+            print(f"  Per connection:  {total_messages / len(messages):.1f}")
             print(f"  Rate:            {total_messages / self.duration_secs:.1f} msg/s")
 
         # Message types
-        tick_count = sum(self.results.get('msg_type_tick', []))
-        welcome_count = sum(self.results.get('msg_type_welcome', []))
-        error_count = sum(self.results.get('msg_type_error', []))
+        tick_count = self.msg_type_counts['tick']
+        welcome_count = self.msg_type_counts['welcome']
+        error_count = self.msg_type_counts['error']
 
         print(f"\nMessage Types:")
         print(f"  Welcome:         {welcome_count}")
         print(f"  Tick:            {tick_count}")
         print(f"  Error:           {error_count}")
 
-        # Latency statistics
-        latencies = self.results['latencies']
-        if latencies:
-            latencies_ms = [lat * 1000 for lat in latencies]
-            latencies_sorted = sorted(latencies_ms)
-
-            print(f"\nMessage Latency (ms):")
-            print(f"  Min:             {min(latencies_ms):.3f}")
-            print(f"  Avg:             {statistics.mean(latencies_ms):.3f}")
-            print(f"  Median:          {statistics.median(latencies_ms):.3f}")
-            print(f"  P95:             {latencies_sorted[int(len(latencies_sorted) * 0.95)]:.3f}")
-            print(f"  P99:             {latencies_sorted[int(len(latencies_sorted) * 0.99)]:.3f}")
-            print(f"  Max:             {max(latencies_ms):.3f}")
+        # Latency statistics (server epoch_ms -> local receive time). This is
+        # one-way, so it also includes any local clock offset from NTP time,
+        # and epoch_ms has 1 ms resolution: samples are biased up by 0-1 ms
+        # (~0.5 ms on average), so sub-ms digits are not real precision.
+        filled = np.arange(self.latencies.shape[1]) < self.counts[:, None]
+        latencies_ns = self.latencies[filled]
+        if latencies_ns.size:
+            lat_min, lat_avg, p50, p95, p99, lat_max = (
+                value / 1e6 for value in summarize_latencies(latencies_ns)
+            )
+
+            print(f"\nTick Delivery Latency (ms):")
+            print(f"  Min:             {lat_min:.3f}")
+            print(f"  Avg:             {lat_avg:.3f}")
+            print(f"  Median:          {p50:.3f}")
+            print(f"  P95:             {p95:.3f}")
+            print(f"  P99:             {p99:.3f}")
+            print(f"  Max:             {lat_max:.3f}")
 
         # JSON errors
-        json_errors = self.results.get('json_errors', [])
-        if json_errors:
-            print(f"\nJSON Parse Errors: {len(json_errors)}")
+        if self.json_errors:
+            print(f"\nJSON Parse Errors: {self.json_errors}")
 
         print("=" * 50)
         print()
@@ -173,6 +383,12 @@ def main():
         default=1,
         help='Number of concurrent connections (default: 1)'
     )
+    parser.add_argument(
+        '--loop',
+        choices=['auto', 'uvloop', 'asyncio'],
+        default='auto',
+        help='Event loop implementation; auto uses uvloop when installed (default: auto)'
+    )
 
     args = parser.parse_args()
 
@@ -182,7 +398,15 @@ def main():
         num_connections=args.connections
     )
 
-    asyncio.run(benchmark.run())
+    if args.loop == 'uvloop' and uvloop is None:
+        print("Error: uvloop library not installed")
+        print("Install with: pip install uvloop")
+        sys.exit(1)
+
+    if args.loop == 'asyncio' or uvloop is None:
+        asyncio.run(benchmark.run())
+    else:
+        uvloop.run(benchmark.run())
 
 
 if __name__ == '__main__':
@@ -4,26 +4,83 @@ Python client example for NTP Time JSON API
 Demonstrates synchronous HTTP requests
 """
 
+import os
+import re
 import requests
 import time
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+# Fast path for /time: only the "data" field (epoch ms) is needed, so skip
+# building the full response dict where possible
+try:
+    import orjson
+
+    def _parse_epoch_ms(raw: bytes) -> Optional[int]:
+        try:
+            body = orjson.loads(raw)
+        except ValueError:  # orjson.JSONDecodeError subclasses ValueError
+            return None
+        return body.get('data') if isinstance(body, dict) else None
+except ImportError:
+    _DATA_RE = re.compile(rb'"data"\s*:\s*(-?\d+)')
+
+    def _parse_epoch_ms(raw: bytes) -> Optional[int]:
+        match = _DATA_RE.search(raw)
+        return int(match.group(1)) if match else None
+
+
+# Concurrent requests used by the benchmark; also sizes the connection pool
+BENCHMARK_WORKERS = 16
+
+USER_AGENT = 'NTP-Time-Python-Client/1.0'
+
 
 class NTPTimeClient:
     """Synchronous client for NTP Time JSON API"""
 
-    def __init__(self, base_url: str = "http://localhost:8080"):
+    def __init__(self, base_url: str = "http://localhost:8080", pool_size: int = BENCHMARK_WORKERS,
+                 use_requests: bool = False):
         """
         Initialize the client
 
         Args:
             base_url: Base URL of the NTP Time API
+            pool_size: Keep-alive connections kept for concurrent callers
+            use_requests: Serve get_time_ms() through the requests Session
+                instead of the raw urllib3 pool
+
+        By default get_time_ms() uses a bare urllib3 pool, which skips
+        requests' per-call overhead but also its environment handling
+        (netrc, cookies, HTTP(S)_PROXY/NO_PROXY). When a proxy applies to
+        base_url the Session is used instead, and HTTPS pools verify against
+        REQUESTS_CA_BUNDLE / CURL_CA_BUNDLE or requests' certifi bundle.
         """
         self.base_url = base_url.rstrip('/')
+        self._time_url = f"{self.base_url}/time"
+        self.use_requests = use_requests or bool(requests.utils.get_environ_proxies(self.base_url))
+        # Raw urllib3 pool for the get_time_ms() hot path; skips requests'
+        # Request -> PreparedRequest pipeline on every call
+        pool_kwargs = {}
+        if self.base_url.startswith('https://'):
+            pool_kwargs.update(
+                cert_reqs='CERT_REQUIRED',
+                ca_certs=(os.environ.get('REQUESTS_CA_BUNDLE')
+                          or os.environ.get('CURL_CA_BUNDLE')
+                          or requests.certs.where()),
+            )
+        self._pool = urllib3.connection_from_url(
+            self.base_url, maxsize=pool_size, headers={'User-Agent': USER_AGENT}, **pool_kwargs
+        )
+        self._time_path = f"{urllib3.util.parse_url(self.base_url).path or ''}/time"
         self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update({
-            'User-Agent': 'NTP-Time-Python-Client/1.0'
+            'User-Agent': USER_AGENT
         })
 
     def get_time(self) -> Optional[Dict[str, Any]]:
@@ -35,7 +92,7 @@ class NTPTimeClient:
             None if request fails
         """
         try:
-            response = self.session.get(f"{self.base_url}/time", timeout=5)
+            response = self.session.get(self._time_url, timeout=5)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -49,10 +106,24 @@ class NTPTimeClient:
         Returns:
             Epoch milliseconds or None if request fails
         """
-        result = self.get_time()
-        if result and result.get('status') == 200:
-            return result.get('data')
-        return None
+        if self.use_requests:
+            try:
+                response = self.session.get(self._time_url, timeout=5)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching time: {e}")
+                return None
+            return _parse_epoch_ms(response.content)
+
+        try:
+            response = self._pool.request('GET', self._time_path, timeout=5, retries=False)
+        except urllib3.exceptions.HTTPError as e:
+            print(f"Error fetching time: {e}")
+            return None
+        if response.status != 200:
+            print(f"Error fetching time: HTTP {response.status}")
+            return None
+        return _parse_epoch_ms(response.data)
 
     def get_time_datetime(self) -> Optional[datetime]:
         """
@@ -101,8 +172,9 @@ class NTPTimeClient:
             return None
 
     def close(self):
-        """Close the session"""
+        """Close the session and connection pool"""
         self.session.close()
+        self._pool.close()
 
     def __enter__(self):
         return self
@@ -163,13 +235,13 @@ def main():
             print(f"   Cache hit rate: {perf.get('cache_hit_rate', 0):.2%}")
             print(f"   Avg latency: {perf.get('avg_latency_us', 0):.2f}μs")
 
-        # Benchmark
-        print("\n7. Benchmark (100 requests):")
+        # Benchmark: the server speaks HTTP/1.1 only, so overlap round
+        # trips across pooled keep-alive connections
+        print(f"\n7. Benchmark (100 requests, {BENCHMARK_WORKERS} workers):")
         start = time.time()
-        successes = 0
-        for _ in range(100):
-            if client.get_time_ms():
-                successes += 1
+        with ThreadPoolExecutor(max_workers=BENCHMARK_WORKERS) as executor:
+            results = list(executor.map(lambda _: client.get_time_ms(), range(100)))
+        successes = sum(1 for r in results if r)
         duration = time.time() - start
         print(f"   Duration: {duration:.3f}s")
         print(f"   Requests/sec: {100/duration:.2f}")
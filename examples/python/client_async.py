@@ -5,10 +5,41 @@ Demonstrates asynchronous HTTP requests using aiohttp
 """
 
 import asyncio
+import re
 import aiohttp
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+# uvloop is an optional, faster drop-in for the default asyncio event loop
+try:
+    from uvloop import run as run_event_loop
+except ImportError:
+    from asyncio import run as run_event_loop
+
+# Fast path for /time: only the "data" field (epoch ms) is needed, so skip
+# building the full response dict where possible
+try:
+    import orjson as _json
+
+    def _parse_epoch_ms(raw: bytes) -> Optional[int]:
+        try:
+            body = _json.loads(raw)
+        except ValueError:  # orjson.JSONDecodeError subclasses ValueError
+            return None
+        return body.get('data') if isinstance(body, dict) else None
+except ImportError:
+    import json as _json
+
+    _DATA_RE = re.compile(rb'"data"\s*:\s*(-?\d+)')
+
+    def _parse_epoch_ms(raw: bytes) -> Optional[int]:
+        match = _DATA_RE.search(raw)
+        return int(match.group(1)) if match else None
+
+# Shared timeouts, built once instead of per request
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=5)
+PROBE_TIMEOUT = aiohttp.ClientTimeout(total=2)
+
 
 class AsyncNTPTimeClient:
     """Asynchronous client for NTP Time JSON API"""
@@ -21,10 +52,21 @@ class AsyncNTPTimeClient:
             base_url: Base URL of the NTP Time API
         """
         self.base_url = base_url.rstrip('/')
+        self._time_url = f"{self.base_url}/time"
         self.session: Optional[aiohttp.ClientSession] = None
 
     async def __aenter__(self):
+        # One pooled connector so concurrent requests reuse keep-alive
+        # connections and DNS results
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=100,
+            ttl_dns_cache=300,
+            keepalive_timeout=30,
+        )
         self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=DEFAULT_TIMEOUT,
             headers={'User-Agent': 'NTP-Time-Python-Async-Client/1.0'}
         )
         return self
@@ -36,19 +78,22 @@ class AsyncNTPTimeClient:
     async def get_time(self) -> Optional[Dict[str, Any]]:
         """Get current NTP time"""
         try:
-            async with self.session.get(f"{self.base_url}/time", timeout=aiohttp.ClientTimeout(total=5)) as response:
+            async with self.session.get(self._time_url) as response:
                 response.raise_for_status()
-                return await response.json()
+                return await response.json(loads=_json.loads)
         except aiohttp.ClientError as e:
             print(f"Error fetching time: {e}")
             return None
 
     async def get_time_ms(self) -> Optional[int]:
         """Get current time as epoch milliseconds"""
-        result = await self.get_time()
-        if result and result.get('status') == 200:
-            return result.get('data')
-        return None
+        try:
+            async with self.session.get(self._time_url) as response:
+                response.raise_for_status()
+                return _parse_epoch_ms(await response.read())
+        except aiohttp.ClientError as e:
+            print(f"Error fetching time: {e}")
+            return None
 
     async def get_time_datetime(self) -> Optional[datetime]:
         """Get current time as Python datetime object"""
@@ -60,7 +105,7 @@ class AsyncNTPTimeClient:
     async def healthz(self) -> bool:
         """Check if service is alive"""
         try:
-            async with self.session.get(f"{self.base_url}/healthz", timeout=aiohttp.ClientTimeout(total=2)) as response:
+            async with self.session.get(f"{self.base_url}/healthz", timeout=PROBE_TIMEOUT) as response:
                 return response.status == 200
         except:
             return False
@@ -68,7 +113,7 @@ class AsyncNTPTimeClient:
     async def readyz(self) -> bool:
         """Check if service is ready"""
         try:
-            async with self.session.get(f"{self.base_url}/readyz", timeout=aiohttp.ClientTimeout(total=2)) as response:
+            async with self.session.get(f"{self.base_url}/readyz", timeout=PROBE_TIMEOUT) as response:
                 return response.status == 200
         except:
             return False
@@ -76,9 +121,9 @@ class AsyncNTPTimeClient:
     async def get_performance(self) -> Optional[Dict[str, Any]]:
         """Get performance metrics"""
         try:
-            async with self.session.get(f"{self.base_url}/performance", timeout=aiohttp.ClientTimeout(total=5)) as response:
+            async with self.session.get(f"{self.base_url}/performance") as response:
                 response.raise_for_status()
-                return await response.json()
+                return await response.json(loads=_json.loads)
         except:
             return None
 
@@ -146,4 +191,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_event_loop(main())
@@ -4,33 +4,111 @@ WebSocket streaming client example for NTP Time JSON API
 Demonstrates real-time time streaming
 """
 
+import argparse
 import asyncio
+import sys
+import time
 import websockets
-import json
 import signal
-from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
+
+# Decode stream messages with msgspec when available: it parses the raw
+# frame bytes straight into a typed struct without building a dict.
+# Otherwise use the fastest available JSON parser.
+try:
+    import msgspec
+
+    class StreamMessage(msgspec.Struct):
+        """Fields of /stream messages used by the client"""
+        type: str = 'unknown'
+        message: Optional[str] = None
+        update_interval_ms: Optional[int] = None
+        max_duration_secs: Optional[int] = None
+        iso8601: Optional[str] = None
+        is_stale: bool = False
+        staleness_secs: int = 0
+        sequence: int = 0
+
+    decode_message = msgspec.json.Decoder(StreamMessage).decode
+    _DecodeError = msgspec.DecodeError
+except ImportError:
+    try:
+        import orjson as _json
+    except ImportError:
+        try:
+            import ujson as _json
+        except ImportError:
+            import json as _json
+
+    class StreamMessage:
+        """Fields of /stream messages used by the client"""
+        __slots__ = ('type', 'message', 'update_interval_ms', 'max_duration_secs',
+                     'iso8601', 'is_stale', 'staleness_secs', 'sequence')
+
+        def __init__(self, data: dict):
+            self.type = data.get('type', 'unknown')
+            self.message = data.get('message')
+            self.update_interval_ms = data.get('update_interval_ms')
+            self.max_duration_secs = data.get('max_duration_secs')
+            self.iso8601 = data.get('iso8601')
+            self.is_stale = data.get('is_stale', False)
+            self.staleness_secs = data.get('staleness_secs', 0)
+            self.sequence = data.get('sequence', 0)
+
+    def decode_message(raw: Union[bytes, str]) -> StreamMessage:
+        return StreamMessage(_json.loads(raw))
+
+    _DecodeError = getattr(_json, 'JSONDecodeError', ValueError)
+
+# uvloop is an optional, faster drop-in for the default asyncio event loop
+try:
+    from uvloop import run as run_event_loop
+except ImportError:
+    from asyncio import run as run_event_loop
+
+# Tick lines are buffered and written to stdout in bulk once either limit
+# is reached, instead of one print() (lock + encode + write) per tick
+OUTPUT_BUFFER_BYTES = 4096
+OUTPUT_FLUSH_INTERVAL_SECS = 0.1
 
 
 class WebSocketTimeClient:
     """WebSocket client for real-time time streaming"""
 
-    def __init__(self, ws_url: str = "ws://localhost:8080/stream"):
+    def __init__(self, ws_url: str = "ws://localhost:8080/stream", quiet: bool = False):
         """
         Initialize WebSocket client
 
         Args:
             ws_url: WebSocket URL of the streaming endpoint
+            quiet: Count ticks without printing them (for benchmark runs)
         """
         self.ws_url = ws_url
-        self.websocket: Optional[websockets.WebSocketClientProtocol] = None
+        self.quiet = quiet
+        self.websocket: Optional[websockets.ClientConnection] = None
         self.running = False
         self.message_count = 0
+        self._out = bytearray()
+        # 0 so the first tick is written straight away
+        self._last_flush = 0.0
+
+    def flush_output(self):
+        """Write buffered tick lines to stdout"""
+        if self._out:
+            # Push any pending print() text first so output stays in order
+            sys.stdout.flush()
+            sys.stdout.buffer.write(self._out)
+            sys.stdout.buffer.flush()
+            self._out.clear()
+            self._last_flush = time.monotonic()
 
     async def connect(self):
         """Connect to WebSocket endpoint"""
         try:
-            self.websocket = await websockets.connect(self.ws_url)
+            # Ticks are tiny JSON frames; skip permessage-deflate
+            self.websocket = await websockets.connect(
+                self.ws_url, compression=None, max_size=2 ** 16
+            )
             self.running = True
             print(f"✓ Connected to {self.ws_url}")
             return True
@@ -52,59 +130,74 @@ class WebSocketTimeClient:
         Args:
             duration: Optional duration in seconds (None = infinite)
         """
-        start_time = asyncio.get_event_loop().time()
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
 
         try:
             while self.running:
-                if duration and (asyncio.get_event_loop().time() - start_time) >= duration:
+                if duration and (loop.time() - start_time) >= duration:
                     break
 
                 try:
-                    message = await asyncio.wait_for(self.websocket.recv(), timeout=1.0)
+                    # Unlike wait_for(), asyncio.timeout() does not wrap recv()
+                    # in a new Task, so frames websockets has already buffered
+                    # are drained back to back without an event loop round trip
+                    async with asyncio.timeout(1.0):
+                        message = await self.websocket.recv(decode=False)
                     await self.handle_message(message)
                 except asyncio.TimeoutError:
+                    # Stream went quiet; don't hold the tail of a burst back
+                    self.flush_output()
                     continue
                 except websockets.exceptions.ConnectionClosed:
+                    self.flush_output()
                     print("✗ Connection closed by server")
                     break
 
         except KeyboardInterrupt:
+            self.flush_output()
             print("\n⚠ Interrupted by user")
+        finally:
+            self.flush_output()
 
-    async def handle_message(self, message: str):
-        """Process received message"""
+    async def handle_message(self, message: Union[bytes, str]):
+        """Process received message (raw frame bytes or text)"""
         try:
-            data = json.loads(message)
-            msg_type = data.get('type', 'unknown')
+            msg = decode_message(message)
+            msg_type = msg.type
+
+            if msg_type != 'tick':
+                self.flush_output()
 
             if msg_type == 'welcome':
-                print(f"\n📡 {data.get('message')}")
-                print(f"   Update interval: {data.get('update_interval_ms')}ms")
-                print(f"   Max duration: {data.get('max_duration_secs')}s")
+                print(f"\n📡 {msg.message}")
+                print(f"   Update interval: {msg.update_interval_ms}ms")
+                print(f"   Max duration: {msg.max_duration_secs}s")
                 print()
 
             elif msg_type == 'tick':
                 self.message_count += 1
-                epoch_ms = data.get('epoch_ms')
-                iso8601 = data.get('iso8601')
-                is_stale = data.get('is_stale', False)
-                staleness = data.get('staleness_secs', 0)
-                sequence = data.get('sequence', 0)
+                if self.quiet:
+                    return
 
-                # Convert epoch to datetime
-                if epoch_ms:
-                    dt = datetime.fromtimestamp(epoch_ms / 1000.0)
-
-                    stale_indicator = "⚠ STALE" if is_stale else "✓"
-                    print(f"[{sequence:04d}] {stale_indicator} {dt.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} UTC (age: {staleness}s)")
+                # The server already formats the tick as RFC 3339 (UTC)
+                if msg.iso8601:
+                    stale_indicator = "⚠ STALE" if msg.is_stale else "✓"
+                    self._out += f"[{msg.sequence:04d}] {stale_indicator} {msg.iso8601.replace('T', ' ')} (age: {msg.staleness_secs}s)\n".encode()
+                    if (len(self._out) >= OUTPUT_BUFFER_BYTES
+                            or time.monotonic() - self._last_flush >= OUTPUT_FLUSH_INTERVAL_SECS):
+                        self.flush_output()
 
             elif msg_type == 'error':
-                print(f"✗ Error: {data.get('message')}")
+                print(f"✗ Error: {msg.message}")
 
             else:
                 print(f"? Unknown message type: {msg_type}")
 
-        except json.JSONDecodeError:
+        except _DecodeError:
+            self.flush_output()
+            if isinstance(message, bytes):
+                message = message.decode('utf-8', errors='replace')
             print(f"✗ Invalid JSON: {message}")
 
     def get_stats(self) -> dict:
@@ -115,7 +208,7 @@ class WebSocketTimeClient:
         }
 
 
-async def main():
+async def main(quiet: bool = False):
     """Example usage"""
     print("=" * 60)
     print("NTP Time JSON API - WebSocket Streaming Client")
@@ -123,7 +216,7 @@ async def main():
     print("\nConnecting to WebSocket stream...")
     print("Press Ctrl+C to stop\n")
 
-    client = WebSocketTimeClient()
+    client = WebSocketTimeClient(quiet=quiet)
 
     if await client.connect():
         try:
@@ -167,8 +260,18 @@ async def continuous_monitoring():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='WebSocket streaming client for NTP Time JSON API'
+    )
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='Count ticks without printing them'
+    )
+    args = parser.parse_args()
+
     # Run basic example (30 seconds)
-    asyncio.run(main())
+    run_event_loop(main(quiet=args.quiet))
 
     # Or run continuous monitoring:
-    # asyncio.run(continuous_monitoring())
+    # run_event_loop(continuous_monitoring())
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """Test WebSocket endpoint"""
 import asyncio
-import json
 import sys
 
 try:
@@ -11,6 +10,30 @@ except ImportError:
     print("Install with: pip install websockets")
     sys.exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: numpy module not installed")
+    print("Install with: pip install numpy")
+    sys.exit(1)
+
+# uvloop is an optional, faster drop-in for the default asyncio event loop
+try:
+    from uvloop import run as run_event_loop
+except ImportError:
+    from asyncio import run as run_event_loop
+
+# Frames are read as raw bytes; orjson parses them without a str decode
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+_JSONDecodeError = getattr(_json, 'JSONDecodeError', ValueError)
+
+# Number of stream messages to collect before checking timestamps
+NUM_MESSAGES = 5
+
 async def test_websocket():
     """Test WebSocket /ws endpoint"""
     uri = "ws://localhost:8080/ws"
@@ -19,32 +42,32 @@ async def test_websocket():
     print(f"Connecting to {uri}")
 
     try:
-        async with websockets.connect(uri) as websocket:
+        async with websockets.connect(uri, compression=None, open_timeout=5, ping_interval=None) as websocket:
             print("✓ Connected successfully")
 
-            # Receive messages for 3 seconds
+            # Receive up to NUM_MESSAGES messages
             messages_received = 0
             timestamps = []
 
             try:
-                for i in range(5):
+                for i in range(NUM_MESSAGES):
                     message = await asyncio.wait_for(
-                        websocket.recv(),
+                        websocket.recv(decode=False),
                         timeout=2.0
                     )
                     messages_received += 1
 
                     # Parse JSON
                     try:
-                        data = json.loads(message)
+                        data = _json.loads(message)
                         if 'epoch_ms' in data:
                             timestamps.append(data['epoch_ms'])
                             print(f"  Message {i+1}: epoch_ms={data['epoch_ms']}, "
                                   f"iso8601={data.get('iso8601', 'N/A')}")
                         else:
-                            print(f"  Message {i+1}: {message}")
-                    except json.JSONDecodeError:
-                        print(f"  Message {i+1} (not JSON): {message}")
+                            print(f"  Message {i+1}: {message.decode(errors='replace')}")
+                    except _JSONDecodeError:
+                        print(f"  Message {i+1} (not JSON): {message.decode(errors='replace')}")
 
             except asyncio.TimeoutError:
                 print("  (Timeout waiting for more messages)")
@@ -53,17 +76,10 @@ async def test_websocket():
 
             # Check timestamp progression
             if len(timestamps) >= 2:
-                all_increasing = all(
-                    timestamps[i] < timestamps[i+1]
-                    for i in range(len(timestamps)-1)
-                )
-                if all_increasing:
+                diffs = np.diff(np.fromiter(timestamps, dtype=np.int64, count=len(timestamps)))
+                if (diffs > 0).all():
                     print("✓ Timestamps are increasing")
-                    avg_diff = sum(
-                        timestamps[i+1] - timestamps[i]
-                        for i in range(len(timestamps)-1)
-                    ) / (len(timestamps) - 1)
-                    print(f"  Average interval: {avg_diff:.0f}ms")
+                    print(f"  Average interval: {diffs.mean():.0f}ms")
                 else:
                     print("✗ FAIL: Timestamps not monotonically increasing")
                     return False
@@ -76,5 +92,5 @@ async def test_websocket():
         return False
 
 if __name__ == "__main__":
-    result = asyncio.run(test_websocket())
+    result = run_event_loop(test_websocket())
     sys.exit(0 if result else 1)